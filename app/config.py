@@ -11,6 +11,12 @@ class Settings(BaseModel):
     JWT_SECRET: str = os.getenv("JWT_SECRET", "CHANGE_ME")
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    OVERDUE_SWEEP_ENABLED: bool = os.getenv("OVERDUE_SWEEP_ENABLED", "1") == "1"
+    OVERDUE_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("OVERDUE_SWEEP_INTERVAL_SECONDS", "3600"))
+    OVERDUE_SWEEP_BATCH_SIZE: int = int(os.getenv("OVERDUE_SWEEP_BATCH_SIZE", "500"))
+    OVERDUE_SWEEP_BATCH_DELAY_SECONDS: float = float(os.getenv("OVERDUE_SWEEP_BATCH_DELAY_SECONDS", "0.5"))
+    OVERDUE_SWEEP_RETRY_SECONDS: int = int(os.getenv("OVERDUE_SWEEP_RETRY_SECONDS", "30"))
+    OVERDUE_FINE_PER_DAY: int = int(os.getenv("OVERDUE_FINE_PER_DAY", "5000"))
 
 
 settings = Settings()
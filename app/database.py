@@ -1,10 +1,25 @@
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import SQLModel, create_engine, Session
 from .config import settings
+from .models import BorrowRecord, OverdueSweepCheckpoint
 
 engine = create_engine(settings.DATABASE_URL, echo=False)
 
+OVERDUE_CHECKPOINT_NAME = "overdue"
+
 def init_db():
     SQLModel.metadata.create_all(engine)
+    # create_all không thêm index vào bảng đã tồn tại (DB cũ chưa có ix_borrowrecord_due_date)
+    for index in BorrowRecord.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    with Session(engine) as session:
+        if not session.get(OverdueSweepCheckpoint, OVERDUE_CHECKPOINT_NAME):
+            session.add(OverdueSweepCheckpoint(name=OVERDUE_CHECKPOINT_NAME))
+            try:
+                session.commit()
+            except IntegrityError:
+                # process khác vừa tạo xong
+                session.rollback()
 
 def get_session():
     with Session(engine) as session:
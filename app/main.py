@@ -1,10 +1,29 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
+from .config import settings
 from .database import init_db
-from .routers import auth, users, books, borrows, author, category
+from .overdue import run_overdue_scheduler
+from .routers import auth, users, books, borrows, author, category, overdue
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    sweeper = None
+    if settings.OVERDUE_SWEEP_ENABLED:
+        sweeper = asyncio.create_task(run_overdue_scheduler())
+    yield
+    if sweeper:
+        sweeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Library API",
     version="1.0.0",
     description="API quản lý thư viện. Auth bằng JWT, phân quyền cơ bản. Tài liệu: /docs",
@@ -26,11 +45,7 @@ app.include_router(books.router)
 app.include_router(borrows.router)
 app.include_router(author.router)
 app.include_router(category.router)
-
-
-@app.on_event("startup")
-def on_startup():
-    init_db()
+app.include_router(overdue.router)
 
 
 def custom_openapi():
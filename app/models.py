@@ -29,7 +29,7 @@ class BorrowRecord(SQLModel, table=True):
     user_id: int = Field(foreign_key="user.id")
     book_id: int = Field(foreign_key="book.id")
     borrowed_at: datetime = Field(default_factory=datetime.utcnow)
-    due_date: date
+    due_date: date = Field(index=True)
     returned_at: Optional[datetime] = None
 
     user: Optional["User"] = Relationship(back_populates="borrows")
@@ -58,6 +58,14 @@ class UserRead(SQLModel):
     is_active: bool
 
 
+class PaginatedUsers(SQLModel):
+    items: List[UserRead]
+    total: Optional[int] = None
+    page: Optional[int] = None
+    size: int
+    next_cursor: Optional[int] = None
+
+
 class Author(SQLModel, table=True):
     id: Optional[int] = Field(
         default=None, sa_column=Column(Integer, primary_key=True, autoincrement=True)
@@ -171,3 +179,64 @@ class PaginatedResponse(SQLModel):
     size: int
     total: int
     items: list[BorrowRecordOut]
+
+
+class CirculationAction(StrEnum):
+    borrow = "borrow"
+    return_ = "return"
+
+
+class BatchCirculationItem(SQLModel):
+    book_id: int
+    action: CirculationAction
+
+
+class BatchCirculationRequest(SQLModel):
+    user_id: int
+    due_date: Optional[date] = None
+    items: list[BatchCirculationItem] = Field(min_length=1, max_length=100)
+
+
+class BatchCirculationItemResult(SQLModel):
+    book_id: int
+    action: CirculationAction
+    ok: bool
+    detail: Optional[str] = None
+    record_id: Optional[int] = None
+    days_overdue: Optional[int] = None
+    fine: Optional[int] = None
+
+
+class BatchCirculationResponse(SQLModel):
+    user_id: int
+    items: list[BatchCirculationItemResult]
+
+
+class OverdueRecord(SQLModel, table=True):
+    borrow_id: int = Field(foreign_key="borrowrecord.id", primary_key=True)
+    user_id: int = Field(index=True)
+    book_id: int = Field(index=True)
+    due_date: date
+    days_overdue: int
+    fine: int
+    returned_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class OverdueSweepCheckpoint(SQLModel, table=True):
+    name: str = Field(primary_key=True, max_length=50)
+    last_due_date: Optional[date] = None
+    last_borrow_id: int = 0
+    last_completed_at: Optional[datetime] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class OverdueRead(SQLModel):
+    borrow_id: int
+    user_id: int
+    book_id: int
+    due_date: date
+    days_overdue: int
+    fine: int
+    returned_at: Optional[datetime]
+    updated_at: datetime
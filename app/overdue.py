@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import and_, or_, update
+from sqlmodel import Session, select
+from .config import settings
+from .database import engine, OVERDUE_CHECKPOINT_NAME
+from .models import BorrowRecord, OverdueRecord, OverdueSweepCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_overdue_batch(batch_size: int, today: Optional[date] = None) -> Optional[bool]:
+    """Quét một lô phiếu mượn chưa trả đã quá hạn, tiếp tục từ checkpoint.
+
+    Trả về True khi đã quét hết một lượt (hoặc lượt gần nhất còn mới),
+    False khi còn lô tiếp theo, None khi process khác đang giữ checkpoint.
+    """
+    today = today or datetime.utcnow().date()
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        # Khóa dòng checkpoint đến hết transaction: chỉ một sweeper chạy tại một thời điểm
+        # dù có nhiều worker/instance; bỏ qua thay vì chờ nếu đã bị khóa.
+        # mssql bỏ qua FOR UPDATE nên cần table hint riêng.
+        cp = session.exec(
+            select(OverdueSweepCheckpoint)
+            .where(OverdueSweepCheckpoint.name == OVERDUE_CHECKPOINT_NAME)
+            .with_for_update(skip_locked=True)
+            .with_hint(OverdueSweepCheckpoint, "WITH (UPDLOCK, READPAST, ROWLOCK)", "mssql")
+        ).first()
+        if not cp:
+            return None
+        if (
+            cp.last_due_date is None
+            and cp.last_completed_at is not None
+            and now - cp.last_completed_at
+            < timedelta(seconds=settings.OVERDUE_SWEEP_INTERVAL_SECONDS)
+        ):
+            return True
+
+        # keyset trên (due_date, id) để dùng index due_date, không quét lại từ đầu
+        stmt = (
+            select(BorrowRecord.id, BorrowRecord.user_id, BorrowRecord.book_id, BorrowRecord.due_date)
+            .where(BorrowRecord.returned_at.is_(None))
+            .where(BorrowRecord.due_date < today)
+        )
+        if cp.last_due_date is not None:
+            stmt = stmt.where(
+                or_(
+                    BorrowRecord.due_date > cp.last_due_date,
+                    and_(
+                        BorrowRecord.due_date == cp.last_due_date,
+                        BorrowRecord.id > cp.last_borrow_id,
+                    ),
+                )
+            )
+        rows = session.exec(
+            stmt.order_by(BorrowRecord.due_date, BorrowRecord.id).limit(batch_size)
+        ).all()
+
+        if rows:
+            existing = {
+                o.borrow_id: o
+                for o in session.exec(
+                    select(OverdueRecord).where(OverdueRecord.borrow_id.in_([r.id for r in rows]))
+                ).all()
+            }
+            for r in rows:
+                if r.id in existing and existing[r.id].returned_at is not None:
+                    continue
+                days = (today - r.due_date).days
+                ov = existing.get(r.id) or OverdueRecord(
+                    borrow_id=r.id, user_id=r.user_id, book_id=r.book_id, due_date=r.due_date,
+                    days_overdue=days, fine=0,
+                )
+                ov.days_overdue = days
+                ov.fine = days * settings.OVERDUE_FINE_PER_DAY
+                ov.updated_at = now
+                session.add(ov)
+            cp.last_due_date = rows[-1].due_date
+            cp.last_borrow_id = rows[-1].id
+
+        finished = len(rows) < batch_size
+        if finished:
+            # đóng các bản ghi của phiếu đã trả ngoài API, giữ lại tiền phạt
+            session.execute(
+                update(OverdueRecord)
+                .where(OverdueRecord.returned_at.is_(None))
+                .where(
+                    OverdueRecord.borrow_id.in_(
+                        select(BorrowRecord.id).where(BorrowRecord.returned_at.is_not(None))
+                    )
+                )
+                .values(
+                    returned_at=select(BorrowRecord.returned_at)
+                    .where(BorrowRecord.id == OverdueRecord.borrow_id)
+                    .scalar_subquery(),
+                    updated_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            cp.last_due_date = None
+            cp.last_borrow_id = 0
+            cp.last_completed_at = now
+
+        cp.updated_at = now
+        session.add(cp)
+        session.commit()
+        return finished
+
+
+def close_overdue_records(
+    session: Session, records: Iterable[BorrowRecord], now: datetime
+) -> dict[int, OverdueRecord]:
+    """Chốt tiền phạt cho các phiếu vừa trả muộn (không commit).
+
+    Trả về OverdueRecord theo borrow_id cho các phiếu trả muộn.
+    """
+    late = [r for r in records if (now.date() - r.due_date).days > 0]
+    if not late:
+        return {}
+    existing = {
+        o.borrow_id: o
+        for o in session.exec(
+            select(OverdueRecord).where(OverdueRecord.borrow_id.in_([r.id for r in late]))
+        ).all()
+    }
+    closed = {}
+    for r in late:
+        days = (now.date() - r.due_date).days
+        ov = existing.get(r.id) or OverdueRecord(
+            borrow_id=r.id, user_id=r.user_id, book_id=r.book_id, due_date=r.due_date,
+            days_overdue=days, fine=0,
+        )
+        ov.days_overdue = days
+        ov.fine = days * settings.OVERDUE_FINE_PER_DAY
+        ov.returned_at = now
+        ov.updated_at = now
+        session.add(ov)
+        closed[r.id] = ov
+    return closed
+
+
+async def run_overdue_scheduler():
+    """Task nền: quét từng lô trong thread riêng để không chặn event loop."""
+    while True:
+        try:
+            finished = await asyncio.to_thread(
+                sweep_overdue_batch, settings.OVERDUE_SWEEP_BATCH_SIZE
+            )
+        except Exception:
+            logger.exception("Overdue sweep failed, retrying")
+            # giữ nguyên checkpoint, thử lại sớm thay vì chờ hết chu kỳ
+            await asyncio.sleep(settings.OVERDUE_SWEEP_RETRY_SECONDS)
+            continue
+        if finished:
+            delay = settings.OVERDUE_SWEEP_INTERVAL_SECONDS
+        elif finished is None:
+            delay = settings.OVERDUE_SWEEP_RETRY_SECONDS
+        else:
+            delay = settings.OVERDUE_SWEEP_BATCH_DELAY_SECONDS
+        await asyncio.sleep(delay)
@@ -4,6 +4,7 @@ from sqlalchemy import func
 from sqlmodel import Session, select
 from ..deps import get_current_user, require_roles
 from ..database import get_session
+from ..overdue import close_overdue_records
 from ..models import (
     BorrowRecord,
     BorrowCreate,
@@ -13,6 +14,10 @@ from ..models import (
     ReturnBookRequest,
     PaginatedResponse,
     BorrowRecordOut,
+    CirculationAction,
+    BatchCirculationRequest,
+    BatchCirculationItemResult,
+    BatchCirculationResponse,
 )
 
 router = APIRouter(prefix="/borrows", tags=["Borrows"])
@@ -60,15 +65,16 @@ def return_book(
             status_code=400, detail="Borrow record not found or already returned"
         )
 
+    # Trả muộn vẫn được nhận; tiền phạt cuối cùng được chốt vào OverdueRecord
     now = datetime.utcnow()
-    if now > rec.due_date:
-        raise HTTPException(status_code=400, detail="Book return is overdue!")
 
     book = session.get(Book, rec.book_id)
     if book:
         book.quantity += 1
         session.add(book)
 
+    close_overdue_records(session, [rec], now)
+
     rec.returned_at = now
     session.add(rec)
     session.commit()
@@ -76,6 +82,99 @@ def return_book(
     return rec
 
 
+@router.post("/batch", response_model=BatchCirculationResponse)
+def batch_circulation(
+    data: BatchCirculationRequest,
+    session: Session = Depends(get_session),
+    _: User = Depends(require_roles(Role.admin, Role.librarian)),
+):
+    has_borrow = any(i.action == CirculationAction.borrow for i in data.items)
+    now = datetime.utcnow()
+    if has_borrow and data.due_date is None:
+        raise HTTPException(status_code=400, detail="due_date is required to borrow")
+    if has_borrow and data.due_date < now.date():
+        raise HTTPException(status_code=400, detail="due_date must not be in the past")
+    patron = session.get(User, data.user_id)
+    if not patron:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not patron.is_active:
+        raise HTTPException(status_code=400, detail="User is inactive")
+
+    # Một truy vấn IN cho toàn bộ sách và một cho các phiếu mượn đang mở.
+    # Khóa các dòng đến khi commit để hai quầy không cùng cho mượn bản cuối;
+    # mssql bỏ qua FOR UPDATE nên cần table hint riêng.
+    book_ids = {i.book_id for i in data.items}
+    books = {
+        b.id: b
+        for b in session.exec(
+            select(Book)
+            .where(Book.id.in_(book_ids))
+            .with_for_update()
+            .with_hint(Book, "WITH (UPDLOCK, ROWLOCK)", "mssql")
+        ).all()
+    }
+
+    return_ids = {i.book_id for i in data.items if i.action == CirculationAction.return_}
+    open_records: dict[int, list[BorrowRecord]] = {}
+    if return_ids:
+        for rec in session.exec(
+            select(BorrowRecord)
+            .where(BorrowRecord.user_id == data.user_id)
+            .where(BorrowRecord.book_id.in_(return_ids))
+            .where(BorrowRecord.returned_at.is_(None))
+            .order_by(BorrowRecord.id)
+            .with_for_update()
+            .with_hint(BorrowRecord, "WITH (UPDLOCK, ROWLOCK)", "mssql")
+        ).all():
+            open_records.setdefault(rec.book_id, []).append(rec)
+
+    results: list[BatchCirculationItemResult] = []
+    new_records: list[tuple[BatchCirculationItemResult, BorrowRecord]] = []
+    returned: list[tuple[BatchCirculationItemResult, BorrowRecord]] = []
+
+    for item in data.items:
+        book = books.get(item.book_id)
+        result = BatchCirculationItemResult(book_id=item.book_id, action=item.action, ok=False)
+        results.append(result)
+
+        if item.action == CirculationAction.borrow:
+            if not book or book.quantity < 1:
+                result.detail = "Book unavailable"
+                continue
+            book.quantity -= 1
+            rec = BorrowRecord(user_id=data.user_id, book_id=book.id, due_date=data.due_date)
+            new_records.append((result, rec))
+            result.ok = True
+        else:
+            pending = open_records.get(item.book_id)
+            if not pending:
+                result.detail = "Borrow record not found or already returned"
+                continue
+            rec = pending.pop(0)
+            rec.returned_at = now
+            if book:
+                book.quantity += 1
+            returned.append((result, rec))
+            result.ok = True
+            result.record_id = rec.id
+
+    closed = close_overdue_records(session, [rec for _, rec in returned], now)
+    for result, rec in returned:
+        overdue = closed.get(rec.id)
+        if overdue:
+            result.detail = "Returned late"
+            result.days_overdue = overdue.days_overdue
+            result.fine = overdue.fine
+
+    session.add_all([rec for _, rec in new_records])
+    session.flush()
+    for result, rec in new_records:
+        result.record_id = rec.id
+    session.commit()
+
+    return BatchCirculationResponse(user_id=data.user_id, items=results)
+
+
 @router.get("/", response_model=PaginatedResponse)
 def list_borrow_records(
     page: int = Query(1, ge=1),
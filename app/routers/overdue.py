@@ -0,0 +1,45 @@
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlmodel import Session, select
+from ..deps import require_roles
+from ..database import get_session
+from ..models import OverdueRecord, OverdueRead, Role, User
+
+router = APIRouter(prefix="/overdue", tags=["Overdue"])
+
+
+def _filter_returned(stmt, returned: Optional[bool]):
+    # returned=False: đang quá hạn; returned=True: đã trả, còn tiền phạt
+    if returned is True:
+        stmt = stmt.where(OverdueRecord.returned_at.is_not(None))
+    elif returned is False:
+        stmt = stmt.where(OverdueRecord.returned_at.is_(None))
+    return stmt
+
+
+@router.get("/users/{user_id}", response_model=list[OverdueRead])
+def list_user_overdue(
+    user_id: int,
+    returned: Optional[bool] = None,
+    session: Session = Depends(get_session),
+    _: User = Depends(require_roles(Role.admin, Role.librarian)),
+):
+    stmt = _filter_returned(
+        select(OverdueRecord).where(OverdueRecord.user_id == user_id), returned
+    )
+    items = session.exec(stmt.order_by(OverdueRecord.due_date)).all()
+    return [OverdueRead.model_validate(o) for o in items]
+
+
+@router.get("/books/{book_id}", response_model=list[OverdueRead])
+def list_book_overdue(
+    book_id: int,
+    returned: Optional[bool] = None,
+    session: Session = Depends(get_session),
+    _: User = Depends(require_roles(Role.admin, Role.librarian)),
+):
+    stmt = _filter_returned(
+        select(OverdueRecord).where(OverdueRecord.book_id == book_id), returned
+    )
+    items = session.exec(stmt.order_by(OverdueRecord.due_date)).all()
+    return [OverdueRead.model_validate(o) for o in items]
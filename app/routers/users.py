@@ -1,17 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlmodel import Session, select
 from ..deps import require_roles
-from ..models import User, UserRead, Role
-from ..database import get_session
+from ..models import User, UserRead, Role, PaginatedUsers
+from ..database import get_session, engine
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-@router.get("/", response_model=list[UserRead])
+# Chỉ lấy các cột cần cho UserRead, không bao giờ load hashed_password
+USER_READ_COLUMNS = (User.id, User.username, User.full_name, User.role, User.is_active)
+EXPORT_BATCH_SIZE = 1000
+
+
+def _apply_filters(stmt, role: Optional[Role], is_active: Optional[bool]):
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active == is_active)
+    return stmt
+
+
+@router.get("/", response_model=PaginatedUsers)
 def list_users(
+    role: Optional[Role] = None,
+    is_active: Optional[bool] = None,
+    cursor: Optional[int] = Query(None, ge=0, description="id cuối cùng của trang trước"),
+    page: Optional[int] = Query(None, ge=1, description="không dùng cùng cursor"),
+    size: int = Query(50, ge=1, le=500),
     session: Session = Depends(get_session),
     _: User = Depends(require_roles(Role.admin))
 ):
-    return [UserRead.model_validate(u) for u in session.exec(select(User)).all()]
+    if cursor is not None and page is not None:
+        raise HTTPException(status_code=400, detail="Use either page or cursor, not both")
+    page = page or 1
+    stmt = _apply_filters(select(*USER_READ_COLUMNS), role, is_active).order_by(User.id)
+    total = None
+    if cursor is not None:
+        # keyset pagination: không COUNT(*) và không quét lại các dòng đã bỏ qua như offset
+        stmt = stmt.where(User.id > cursor)
+    else:
+        count_stmt = _apply_filters(select(func.count()).select_from(User), role, is_active)
+        total = session.exec(count_stmt).one()
+        stmt = stmt.offset((page - 1) * size)
+    rows = session.exec(stmt.limit(size)).all()
+
+    items = [UserRead.model_validate(dict(row._mapping)) for row in rows]
+    next_cursor = items[-1].id if len(items) == size else None
+
+    return PaginatedUsers(
+        items=items,
+        total=total,
+        page=page if cursor is None else None,
+        size=size,
+        next_cursor=next_cursor,
+    )
+
+
+def _csv_cell(value) -> str:
+    if value is None:
+        return ""
+    text = str(value)
+    # chặn CSV/formula injection khi mở file bằng Excel/Sheets
+    if text.startswith(("=", "+", "-", "@", "\t", "\r")):
+        return "'" + text
+    return text
+
+
+def _export_rows(role: Optional[Role], is_active: Optional[bool]):
+    # Session riêng: session của dependency đã đóng trước khi response được stream
+    with Session(engine) as session:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow([c.key for c in USER_READ_COLUMNS])
+        last_id = 0
+        while True:
+            stmt = _apply_filters(select(*USER_READ_COLUMNS), role, is_active)
+            stmt = stmt.where(User.id > last_id).order_by(User.id).limit(EXPORT_BATCH_SIZE)
+            rows = session.exec(stmt).all()
+            for row in rows:
+                writer.writerow([_csv_cell(v) for v in row])
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            if len(rows) < EXPORT_BATCH_SIZE:
+                break
+            last_id = rows[-1].id
+
+
+@router.get("/export")
+def export_users(
+    role: Optional[Role] = None,
+    is_active: Optional[bool] = None,
+    _: User = Depends(require_roles(Role.admin))
+):
+    return StreamingResponse(
+        _export_rows(role, is_active),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+    )
 
 @router.patch("/{user_id}/role", response_model=UserRead)
 def update_role(